@@ -1,26 +1,97 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
+import os
+
+# Cooperative IO for gunicorn's gevent workers: patch the stdlib before
+# anything imports socket/ssl so SMTP and DB waits yield to other
+# greenlets instead of blocking the worker. Opt-in via env so the dev
+# server and sync workers stay un-patched.
+if os.environ.get('GEVENT_MONKEY_PATCH', '').lower() == 'true':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, flash, send_from_directory
 from flask_cors import CORS
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from flask_wtf.csrf import CSRFProtect
 from flask_sqlalchemy import SQLAlchemy
 from flask_mail import Mail, Message
-from flask_wtf import FlaskForm
-from wtforms import StringField, PasswordField, SubmitField, BooleanField
-from wtforms.validators import DataRequired, Email, EqualTo, Length
+from werkzeug.exceptions import HTTPException
 from werkzeug.security import generate_password_hash, check_password_hash
-from itsdangerous import URLSafeTimedSerializer
-from dotenv import load_dotenv
+from itsdangerous import BadData, URLSafeTimedSerializer
 from sqlalchemy import text
-import pandas as pd
-import numpy as np
-import os
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
+import atexit
+import hashlib
+import hmac
+import jinja2
+import json
+import logging
+import pickle
+import queue
+import re
+import string
+import tempfile
+import threading
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+from smtplib import SMTPException, SMTPServerDisconnected
 
-# Load environment variables
-load_dotenv()  
+# Load environment variables from .env - production uses real env vars,
+# so skip the dotenv import and filesystem scan there
+if os.environ.get('FLASK_ENV') != 'production':
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Initialize Flask app
 app = Flask(__name__, static_folder='static', static_url_path='/static')
 
+# Jinja bytecode cache: compiled templates persist on disk, so worker
+# restarts skip the parse/compile step; production also skips the
+# per-render mtime check
+_jinja_cache_dir = os.path.join(tempfile.gettempdir(), 'loan_app_jinja_cache')
+try:
+    os.makedirs(_jinja_cache_dir, exist_ok=True)
+    app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache(_jinja_cache_dir)
+except OSError as e:
+    print(f"⚠️ Could not set up Jinja bytecode cache: {e}")
+if os.environ.get('FLASK_ENV') == 'production':
+    app.jinja_env.auto_reload = False
+
+# orjson-backed JSON provider: every jsonify()/request.get_json() call
+# serializes through the Rust implementation instead of stdlib json
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+    print("✅ Using orjson for JSON responses")
+except ImportError:
+    print("⚠️ orjson not installed - using stdlib json")
+
+# Request-path diagnostics go through the app logger with %-style lazy
+# formatting: disabled levels skip argument formatting entirely, and
+# records don't serialize every worker on the stdio lock like print()
+app.logger.setLevel(logging.DEBUG if os.environ.get('FLASK_DEBUG', '').lower() == 'true' else logging.INFO)
+
+# Emission is offloaded to a listener thread via a queue: the request
+# path only enqueues the record, so a slow log collector on the other
+# end of the stdout pipe never blocks a worker
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, *app.logger.handlers, respect_handler_level=True)
+app.logger.handlers = [QueueHandler(_log_queue)]
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = app.logger
+
 # Security
 secret_key = os.environ.get('SESSION_SECRET')
 if not secret_key:
@@ -32,6 +103,15 @@ if not secret_key:
 
 app.config['SECRET_KEY'] = secret_key
 
+# CSRF tokens live for the session instead of being re-derived against a
+# timestamp on every POST; session cookies stay out of cross-site
+# requests and script reach
+app.config['WTF_CSRF_TIME_LIMIT'] = None
+app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+app.config['SESSION_COOKIE_HTTPONLY'] = True
+if os.environ.get('FLASK_ENV') == 'production':
+    app.config['WTF_CSRF_SSL_STRICT'] = True
+
 # Flask-Mail configuration
 app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
 app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
@@ -47,6 +127,23 @@ if database_url.startswith('postgres://'):
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Engine options - on Postgres, let psycopg2 batch multi-row inserts into
+# consolidated VALUES statements, and size the pool explicitly:
+# pre-ping swaps a stale-connection error for a cheap ping, LIFO reuse
+# keeps the hottest connection (and its TLS session) warm, and recycle
+# stays under typical server-side idle timeouts
+engine_options = {}
+if database_url.startswith('postgresql'):
+    engine_options.update({
+        'executemany_mode': 'values_plus_batch',
+        'pool_pre_ping': True,
+        'pool_size': 20,
+        'max_overflow': 10,
+        'pool_recycle': 1800,
+        'pool_use_lifo': True,
+    })
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
 # Initialize extensions
 CORS(app, origins=["*"], supports_credentials=False)
 db = SQLAlchemy(app)
@@ -55,33 +152,192 @@ login_manager.login_view = 'login'
 login_manager.login_message_category = 'info'
 mail = Mail(app)
 
+# App-wide CSRF: every POST is checked once at the extension layer, and
+# the JSON prediction endpoints opt out explicitly below - they carry no
+# session-mutating side effects and SPA fetch() calls send no form token
+csrf = CSRFProtect(app)
+
+# N+1 query detection, debug only - surfaces hidden lazy loads as soon
+# as relationships are added to the models
+if os.environ.get('FLASK_DEBUG', '').lower() == 'true':
+    try:
+        from nplusone.ext.flask_sqlalchemy import NPlusOne
+        app.config['NPLUSONE_RAISE'] = os.environ.get('NPLUSONE_RAISE', '').lower() == 'true'
+        NPlusOne(app)
+        print("✅ nplusone N+1 detection enabled")
+    except ImportError:
+        print("⚠️ nplusone not installed - N+1 detection disabled")
+
 # Password reset serializer
-serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'])
+class CachedSaltSerializer(URLSafeTimedSerializer):
+    """URLSafeTimedSerializer that memoizes the signer per salt.
+
+    itsdangerous re-derives the HMAC signing key on every dumps/loads
+    call; the reset flow always uses the same salt, so cache the signer
+    instead of paying the key derivation per token.
+    """
+
+    @lru_cache(maxsize=8)
+    def make_signer(self, salt=None):
+        return super().make_signer(salt)
+
+serializer = CachedSaltSerializer(
+    app.config['SECRET_KEY'],
+    signer_kwargs={'digest_method': hashlib.sha256},
+)
+
+# Explicit password hash method so register/login CPU cost is pinned
+# rather than tracking Werkzeug's default iteration count
+PASSWORD_HASH_METHOD = 'scrypt:32768:8:1'
+
+# Password hashing - prefer argon2id (memory-hard, C implementation that
+# releases the GIL) and fall back to Werkzeug's scrypt when argon2-cffi
+# isn't installed. Hashes from either scheme keep verifying.
+password_hasher = None
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
+    # Costs are env-tunable so deployments can calibrate verify time to
+    # their latency budget (raise until a verify takes ~100-250ms on the
+    # production hardware); rehash-on-login migrates old hashes forward
+    password_hasher = PasswordHasher(
+        time_cost=int(os.environ.get('ARGON2_TIME_COST', 2)),
+        memory_cost=int(os.environ.get('ARGON2_MEMORY_COST', 65536)),
+        parallelism=int(os.environ.get('ARGON2_PARALLELISM', 1)),
+    )
+    print("✅ Using argon2id password hashing")
+except ImportError:
+    print("⚠️ argon2-cffi not installed - using Werkzeug password hashing")
+
+def hash_password(password):
+    if password_hasher:
+        return password_hasher.hash(password)
+    return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+def _verify_password_uncached(password_hash, password):
+    if password_hasher and password_hash.startswith('$argon2'):
+        try:
+            return password_hasher.verify(password_hash, password)
+        except VerifyMismatchError:
+            return False
+        except (VerificationError, InvalidHashError):
+            return False
+    # Legacy Werkzeug hashes (pbkdf2/scrypt prefixes)
+    return check_password_hash(password_hash, password)
+
+# Opt-in cache of *successful* verifications: rapid re-auth within a few
+# seconds skips the deliberately expensive KDF. Only positive results
+# are cached (a negative cache would help password enumeration), keys
+# pair the stored hash with a SHA-256 of the attempt so no plaintext is
+# held, and the whole thing stays off unless explicitly enabled.
+PASSWORD_VERIFY_CACHE = os.environ.get('PASSWORD_VERIFY_CACHE', '').lower() == 'true'
+PASSWORD_VERIFY_TTL = 10
+_pw_verify_cache = {}  # (password_hash, sha256(password)) -> expires_at
+_pw_verify_lock = threading.Lock()
+
+def verify_password(password_hash, password):
+    if not PASSWORD_VERIFY_CACHE:
+        return _verify_password_uncached(password_hash, password)
+    key = (password_hash, hashlib.sha256(password.encode()).digest())
+    now = time.time()
+    with _pw_verify_lock:
+        expires_at = _pw_verify_cache.get(key)
+        if expires_at and now < expires_at:
+            return True
+    ok = _verify_password_uncached(password_hash, password)
+    if ok:
+        with _pw_verify_lock:
+            if len(_pw_verify_cache) >= 1024:
+                _pw_verify_cache.clear()
+            _pw_verify_cache[key] = now + PASSWORD_VERIFY_TTL
+    return ok
+
+@lru_cache(maxsize=1)
+def _dummy_password_hash():
+    """Throwaway hash verified when login finds no matching user.
+
+    Burning the same KDF cost on the not-found branch keeps "no such
+    user" and "wrong password" indistinguishable by response timing, so
+    the login form can't be used to enumerate accounts. Computed lazily
+    so app boot doesn't pay for an argon2 hash.
+    """
+    return hash_password('not-a-real-password')
+
+def maybe_upgrade_password_hash(user, password):
+    """Transparently migrate a verified login to the current hash scheme.
+
+    Re-hashes legacy Werkzeug hashes - and argon2 hashes made with
+    outdated parameters - while the plaintext is available, so the
+    stored hashes converge on the tuned argon2id settings over time.
+    """
+    if not password_hasher:
+        return
+    try:
+        if user.password_hash.startswith('$argon2') and not password_hasher.check_needs_rehash(user.password_hash):
+            return
+        user.update_password(password_hasher.hash(password))
+        logger.info("Upgraded password hash for %s", user.username)
+    except Exception as e:
+        logger.warning("Password hash upgrade failed: %s", e)
+
+# Celery task queue (optional) - sends emails in the background so the
+# forgot-password request doesn't block on the SMTP round-trip
+celery = None
+try:
+    from celery import Celery
+    from celery.exceptions import MaxRetriesExceededError
+    broker_url = os.environ.get('CELERY_BROKER_URL', os.environ.get('REDIS_URL'))
+    if broker_url:
+        celery = Celery(app.name, broker=broker_url)
+        celery.conf.update(
+            task_ignore_result=True,  # no result backend - don't buffer results
+            broker_connection_retry_on_startup=True,
+        )
+        print("✅ Celery task queue configured")
+    else:
+        print("⚠️ No CELERY_BROKER_URL/REDIS_URL set - emails will be sent synchronously")
+except ImportError:
+    print("⚠️ Celery not installed - emails will be sent synchronously")
+
+# Redis cache (optional) - shares REDIS_URL with Celery
+redis_client = None
+try:
+    import redis as redis_lib
+    if os.environ.get('REDIS_URL'):
+        redis_client = redis_lib.Redis.from_url(os.environ['REDIS_URL'])
+        print("✅ Redis cache configured")
+except ImportError:
+    print("⚠️ Redis not installed - using in-process caches")
+
+# Server-side sessions (optional): with Redis available the session data
+# (flashes, CSRF token) lives in Redis and only a short key rides in the
+# cookie, so responses shrink and the full session isn't re-signed per
+# request. TTL matches verify_reset_token's 1 hour max_age.
+if redis_client:
+    try:
+        from flask_session import Session
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = redis_client
+        app.config['SESSION_PERMANENT'] = False
+        app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=1)
+        Session(app)
+        print("✅ Redis-backed sessions enabled")
+    except ImportError:
+        print("⚠️ Flask-Session not installed - using signed-cookie sessions")
 
 # ================================
 # Forms
 # ================================
-class LoginForm(FlaskForm):
-    username = StringField('Username or Email', validators=[DataRequired()])
-    password = PasswordField('Password', validators=[DataRequired()])
-    remember = BooleanField('Remember Me')
-    submit = SubmitField('Sign In')
-
-class RegistrationForm(FlaskForm):
-    username = StringField('Username', validators=[DataRequired(), Length(min=4, max=20)])
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
-    confirm_password = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
-    submit = SubmitField('Create Account')
-
-class ForgotPasswordForm(FlaskForm):
-    email = StringField('Email', validators=[DataRequired(), Email()])
-    submit = SubmitField('Send Reset Link')
-
-class ResetPasswordForm(FlaskForm):
-    password = PasswordField('New Password', validators=[DataRequired(), Length(min=6)])
-    password2 = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
-    submit = SubmitField('Reset Password')
+@lru_cache(maxsize=None)
+def get_forms():
+    """Import the WTForms classes on first use.
+
+    Importing wtforms pulls in email_validator and its dns machinery,
+    which costs hundreds of ms at cold start; only the auth routes need
+    it, so defer the import until the first form is built.
+    """
+    import forms
+    return forms
 
 # ================================
 # Database Model
@@ -90,85 +346,314 @@ class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Functional indexes so case-insensitive lookups stay index scans
+    # instead of falling back to sequential scans on lower(...)
+    __table_args__ = (
+        db.Index('ix_user_username_lower', db.func.lower(username)),
+        db.Index('ix_user_email_lower', db.func.lower(email)),
+    )
+
+    # These lookups never write, so skip the session's dirty-object scan
+    # (autoflush) that otherwise runs before each query
+
     @staticmethod
     def query_by_username_or_email(identifier):
-        return User.query.filter((User.username == identifier) | (User.email == identifier)).first()
+        identifier = identifier.strip().lower()
+        with db.session.no_autoflush:
+            return User.query.filter(
+                (db.func.lower(User.username) == identifier) | (db.func.lower(User.email) == identifier)
+            ).first()
 
     @staticmethod
     def query_by_email(email):
-        return User.query.filter_by(email=email).first()
+        with db.session.no_autoflush:
+            return User.query.filter(db.func.lower(User.email) == email.strip().lower()).first()
 
     @staticmethod
     def query_by_username(username):
-        return User.query.filter_by(username=username).first()
+        with db.session.no_autoflush:
+            return User.query.filter(db.func.lower(User.username) == username.strip().lower()).first()
+
+    @staticmethod
+    def find_conflict(username, email):
+        """Find existing users clashing on username or email in one query.
+
+        Returns up to two (username, email) rows - registration only
+        needs to know which fields collided, not the full users, and
+        both fields can collide against different rows.
+        """
+        with db.session.no_autoflush:
+            return db.session.query(User.username, User.email).filter(
+                (db.func.lower(User.username) == username.strip().lower()) |
+                (db.func.lower(User.email) == email.strip().lower())
+            ).limit(2).all()
+
+    @staticmethod
+    def bulk_insert(rows):
+        """Insert many users with one executemany statement.
+
+        For seed/import scripts: one batched INSERT instead of a
+        round-trip per row. `rows` is a list of column dicts.
+        """
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
 
     def update_password(self, new_password_hash):
         self.password_hash = new_password_hash
         db.session.commit()
+        invalidate_user_cache(self.id)
         return True
 
+# ================================
+# User cache for load_user
+# ================================
+# Flask-Login calls load_user on every authenticated request, which would
+# otherwise issue a SELECT per request for a row that almost never changes.
+# Cache the user fields for a short TTL (Redis when available, an in-process
+# dict otherwise) and rebuild a detached User instance on cache hits.
+USER_CACHE_TTL = 300
+# The in-process fallback can't be invalidated across workers, so it
+# uses a much shorter TTL and a bounded size; the lock keeps it safe
+# under threaded/gevent workers
+USER_CACHE_LOCAL_TTL = 30
+USER_CACHE_LOCAL_MAX = 4096
+_user_cache = {}  # in-process fallback: user_id -> (expires_at, fields)
+_user_cache_lock = threading.Lock()
+
+def _user_to_fields(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'password_hash': user.password_hash,
+        'created_at': user.created_at,
+    }
+
+def cache_user(user):
+    fields = _user_to_fields(user)
+    if redis_client:
+        try:
+            redis_client.setex(f"user:{user.id}", USER_CACHE_TTL, pickle.dumps(fields))
+            return
+        except Exception as e:
+            logger.warning("Redis cache write failed: %s", e)
+    now = time.time()
+    with _user_cache_lock:
+        if len(_user_cache) >= USER_CACHE_LOCAL_MAX:
+            # Drop expired entries first, then fall back to clearing
+            expired = [uid for uid, (expires_at, _) in _user_cache.items() if expires_at <= now]
+            for uid in expired:
+                del _user_cache[uid]
+            if len(_user_cache) >= USER_CACHE_LOCAL_MAX:
+                _user_cache.clear()
+        _user_cache[user.id] = (now + USER_CACHE_LOCAL_TTL, fields)
+
+def get_cached_user(user_id):
+    if redis_client:
+        try:
+            cached = redis_client.get(f"user:{user_id}")
+            if cached:
+                return User(**pickle.loads(cached))
+        except Exception as e:
+            logger.warning("Redis cache read failed: %s", e)
+        return None
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry:
+            expires_at, fields = entry
+            if time.time() < expires_at:
+                return User(**fields)
+            del _user_cache[user_id]
+    return None
+
+def invalidate_user_cache(user_id):
+    if redis_client:
+        try:
+            redis_client.delete(f"user:{user_id}")
+        except Exception as e:
+            logger.warning("Redis cache delete failed: %s", e)
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    user = get_cached_user(user_id)
+    if user:
+        return user
+    # 2.0-style session.get: identity-map aware and skips the legacy
+    # Query.get wrapper on every authenticated request
+    user = db.session.get(User, user_id)
+    if user:
+        cache_user(user)
+    return user
 
 # ================================
 # Password Reset Helpers
 # ================================
-def send_password_reset_email(user):
-    """Send password reset email (or fallback to console/flash)."""
-    try:
-        token = serializer.dumps(user.email, salt='password-reset-salt')
-        reset_url = url_for('reset_password', token=token, _external=True)
+# Cached external URL template for reset links - url_for walks the URL
+# map and resolves the host on every call, but only the token varies
+_reset_url_template = None
 
-        # Print to console for debugging
-        print(f"🔗 Password reset URL for {user.email}: {reset_url}")
+def build_reset_url(token):
+    global _reset_url_template
+    if _reset_url_template is None:
+        _reset_url_template = url_for('reset_password', token='__TOKEN__', _external=True)
+    return _reset_url_template.replace('__TOKEN__', token)
 
-        # If email not configured, show link in flash message
-        if not app.config.get('MAIL_USERNAME') or not app.config.get('MAIL_PASSWORD'):
-            print("⚠️ Email not configured - reset link shown in flash message")
-            flash(f'Password reset link: {reset_url}', 'info')
-            return True
-
-        # FIXED: Use the configured sender - now using loanpredictorapp@gmail.com
-        msg = Message(
-            'Password Reset Request - Loan Prediction System',
-            recipients=[user.email],
-            sender=app.config['MAIL_DEFAULT_SENDER'],  # ← FIXED: Now uses loanpredictorapp@gmail.com
-            body=f"""
-Hello {user.username},
+# Email body parsed once at import; each send only substitutes the two
+# placeholders instead of rebuilding and stripping the whole string
+_RESET_BODY_TMPL = string.Template("""Hello $username,
 
 You requested a password reset for your Loan Prediction System account.
 
 Click the following link to reset your password:
-{reset_url}
+$reset_url
 
 This link will expire in 1 hour for security reasons.
 
 If you did not request this reset, please ignore this email.
 
 Best regards,
-Loan Predictor Team
-            """.strip()
-        )
-        mail.send(msg)
-        print(f"✅ Email sent to {user.email}")
-        flash('Password reset email has been sent!', 'success')  # ADDED: Success feedback
+Loan Predictor Team""")
+
+def build_reset_message(email, username, reset_url):
+    """Build the password reset email message."""
+    return Message(
+        'Password Reset Request - Loan Prediction System',
+        recipients=[email],
+        sender=app.config['MAIL_DEFAULT_SENDER'],
+        body=_RESET_BODY_TMPL.substitute(username=username, reset_url=reset_url),
+    )
+
+if celery:
+    # One SMTP connection per worker process: the TLS handshake and AUTH
+    # are paid on first send, then the connection is reused across tasks
+    # and reopened only when the server drops it
+    _smtp_conn = None
+    _smtp_lock = threading.Lock()
+
+    def _send_on_pooled_connection(msg):
+        global _smtp_conn
+        with _smtp_lock:
+            for attempt in (1, 2):
+                if _smtp_conn is None:
+                    conn = mail.connect()
+                    conn.__enter__()
+                    _smtp_conn = conn
+                try:
+                    _smtp_conn.send(msg)
+                    return
+                except SMTPServerDisconnected:
+                    _smtp_conn = None
+                    if attempt == 2:
+                        raise
+
+    @celery.task(bind=True, max_retries=3, default_retry_delay=30)
+    def send_reset_email_task(self, email, username, reset_url):
+        """Send the reset email from a Celery worker, retrying on SMTP errors."""
+        try:
+            with app.app_context():
+                msg = build_reset_message(email, username, reset_url)
+                _send_on_pooled_connection(msg)
+                logger.info("Reset email sent to %s", email)
+        except SMTPException as e:
+            logger.warning("SMTP error sending reset email, retrying: %s", e)
+            try:
+                raise self.retry(exc=e)
+            except MaxRetriesExceededError:
+                logger.error("Giving up on reset email to %s after %d retries", email, self.max_retries)
+
+def send_password_reset_email(user):
+    """Send password reset email (or fallback to console/flash)."""
+    try:
+        token = serializer.dumps(user.email, salt='password-reset-salt')
+        reset_url = build_reset_url(token)
+
+        # Print to console for debugging
+        logger.info("Password reset URL for %s: %s", user.email, reset_url)
+
+        # If email not configured, show link in flash message
+        if not app.config.get('MAIL_USERNAME') or not app.config.get('MAIL_PASSWORD'):
+            logger.info("Email not configured - reset link shown in flash message")
+            flash(f'Password reset link: {reset_url}', 'info')
+            return True
+
+        # Queue the SMTP send in the background when Celery is available so the
+        # request returns immediately; fall back to a synchronous send otherwise
+        if celery:
+            send_reset_email_task.delay(user.email, user.username, reset_url)
+            logger.info("Reset email for %s queued for background delivery", user.email)
+        else:
+            msg = build_reset_message(user.email, user.username, reset_url)
+            mail.send(msg)
+            logger.info("Reset email sent to %s", user.email)
+        flash('Password reset email has been sent!', 'success')
         return True
 
     except Exception as e:
-        print(f"❌ Error sending reset email: {e}")
+        logger.error("Error sending reset email: %s", e)
         # Still show the link in flash message as fallback
         flash(f'Error sending email. Reset link: {reset_url}', 'error')
         return False
 
+# Dedupe window so a retry-happy user (or a bot hammering the form)
+# can't flood the mail worker and the SMTP quota for one address
+RESET_EMAIL_WINDOW = 300
+_reset_email_sent = {}  # in-process fallback: email -> window expiry
+
+def reset_email_recently_sent(email):
+    """True if a reset email already went to this address in the window."""
+    if redis_client:
+        try:
+            # SET NX returns None when the key already exists
+            return not redis_client.set(f"pwreset:{email}", "1", ex=RESET_EMAIL_WINDOW, nx=True)
+        except Exception as e:
+            logger.warning("Redis dedupe check failed: %s", e)
+    now = time.time()
+    expires_at = _reset_email_sent.get(email)
+    if expires_at and now < expires_at:
+        return True
+    _reset_email_sent[email] = now + RESET_EMAIL_WINDOW
+    return False
+
+# Short-lived verification cache: reloading the reset page (or a bot
+# spraying garbage tokens) re-verifies the same token repeatedly, and
+# each verify is an HMAC over the payload. Failures are cached too so
+# spray traffic stays out of the signature math. The 60s TTL is small
+# against the 1h token expiry, so a token expires at most a minute late.
+TOKEN_VERIFY_TTL = 60
+TOKEN_VERIFY_MAX = 2048
+_token_verify_cache = {}  # token -> (expires_at, email or None)
+_token_verify_lock = threading.Lock()
+
+# Anything a real token could look like: URL-safe base64 segments with
+# dot separators, within sane length bounds. Garbage that can't match
+# is rejected before any signature math or cache writes.
+_TOKEN_RE = re.compile(r'^[A-Za-z0-9_\-\.]{20,512}$')
+
 def verify_reset_token(token, expiration=3600):
-    try:
-        return serializer.loads(token, salt='password-reset-salt', max_age=expiration)
-    except:
+    if not _TOKEN_RE.match(token):
         return None
+    now = time.time()
+    with _token_verify_lock:
+        entry = _token_verify_cache.get(token)
+        if entry and now < entry[0]:
+            return entry[1]
+    try:
+        email = serializer.loads(token, salt='password-reset-salt', max_age=expiration)
+    except BadData:
+        # Covers BadSignature and SignatureExpired; anything else is a
+        # real bug and should reach the global handler
+        email = None
+    with _token_verify_lock:
+        if len(_token_verify_cache) >= TOKEN_VERIFY_MAX:
+            _token_verify_cache.clear()
+        _token_verify_cache[token] = (now + TOKEN_VERIFY_TTL, email)
+    return email
 
 # ================================
 # Database connection
@@ -188,6 +673,16 @@ def init_db():
         if check_database_connection():
             try:
                 db.create_all()
+                # create_all skips indexes when the table already exists,
+                # so databases created before the functional indexes were
+                # added need them created explicitly. checkfirst can't
+                # reflect expression indexes on SQLite, so treat
+                # "already exists" as success.
+                for index in User.__table_args__:
+                    try:
+                        index.create(bind=db.engine, checkfirst=True)
+                    except (OperationalError, ProgrammingError):
+                        pass
                 print("✅ Database tables created")
             except Exception as e:
                 print(f"❌ Error creating tables: {e}")
@@ -207,9 +702,81 @@ def check_email_config():
 # ================================
 # ML Prediction Function
 # ================================
+# Reciprocals hoisted to module level so the scalar path multiplies by
+# compiled-in floats instead of re-dividing per call
+_INV_550 = 1.0 / 550.0
+_INV_50 = 1.0 / 50.0
+_INV_30 = 1.0 / 30.0
+_INV_20 = 1.0 / 20.0
+_INV_10 = 1.0 / 10.0
+
+# Fixed input schema for the risk model, with the same defaults the
+# scalar path applies for missing fields
+FEATURES = ('LoanAmount', 'AnnualIncome', 'InterestRate', 'EmploymentLength',
+            'FicoScore', 'DebtToIncomeRatio', 'OpenAccounts')
+FEATURE_DEFAULTS = (10000.0, 50000.0, 7.5, 5.0, 700.0, 25.0, 5.0)
+
+def rows_to_feature_arrays(rows):
+    """Build per-feature float arrays from a list of input dicts.
+
+    np.fromiter fills each array straight from a generator - no
+    intermediate lists and no pandas - ready to feed risk_kernel.
+    """
+    import numpy as np
+    count = len(rows)
+    return tuple(
+        np.fromiter((float(row.get(name, default)) for row in rows),
+                    dtype=np.float64, count=count)
+        for name, default in zip(FEATURES, FEATURE_DEFAULTS)
+    )
+
+def risk_kernel(loan_amount, annual_income, interest_rate, employment_length,
+                fico_score, dti_ratio, open_accounts):
+    """Vectorized risk scoring over aligned 1-D float arrays.
+
+    Same weighted formula as predict_loan_default, but written on NumPy
+    arrays so batch callers run one set of array ops instead of looping
+    the scalar path per row. Returns (prediction, risk_score) arrays.
+    """
+    import numpy as np  # deferred - only batch scoring needs numpy
+
+    loan_to_income = loan_amount / annual_income
+    fico_factor = (850.0 - fico_score) / 550.0
+    employment_factor = np.maximum(0.0, 1.0 - employment_length / 10.0)
+    dti_factor = np.minimum(1.0, dti_ratio / 50.0)
+    interest_factor = interest_rate / 30.0
+    accounts_factor = np.minimum(1.0, open_accounts / 20.0)
+
+    risk_score = (
+        loan_to_income * 0.25 +
+        fico_factor * 0.20 +
+        dti_factor * 0.20 +
+        interest_factor * 0.15 +
+        employment_factor * 0.10 +
+        accounts_factor * 0.10
+    )
+    risk_score = np.clip(risk_score, 0.1, 0.9)
+    prediction = (risk_score > 0.5).astype(np.int64)
+    return prediction, risk_score
+
+def predict_batch(rows):
+    """Score a list of input dicts in one vectorized pass.
+
+    Returns (prediction, risk_score, risk_level) arrays aligned with
+    rows - interpreter overhead is paid once per batch, not per row.
+    """
+    import numpy as np
+    prediction, risk_score = risk_kernel(*rows_to_feature_arrays(rows))
+    risk_level = np.select([risk_score > 0.7, risk_score > 0.4], ['High', 'Medium'], 'Low')
+    return prediction, risk_score, risk_level
+
 def predict_loan_default(input_data):
-    """Enhanced prediction function with multiple factors"""
-    print("🎯 Running loan default prediction")
+    """Enhanced prediction function with multiple factors.
+
+    Takes the parsed JSON body as a plain dict - deliberately no
+    DataFrame round-trip on this per-request path.
+    """
+    logger.debug("Running loan default prediction")
     
     try:
         # Extract values safely
@@ -233,26 +800,30 @@ def predict_loan_default(input_data):
             open_accounts = 5
             term = 36
 
-        # Advanced risk calculation with multiple factors
-        loan_to_income = loan_amount / annual_income
-        fico_factor = (850 - fico_score) / 550  # Normalize FICO score (300-850)
-        employment_factor = max(0, 1 - (employment_length / 10))  # More employment = better
-        dti_factor = min(1, dti_ratio / 50)  # DTI above 50% is high risk
-        interest_factor = interest_rate / 30  # Interest rate impact
-        accounts_factor = min(1, open_accounts / 20)  # Too many accounts = risk
-        
-        # Weighted risk score
+        # Advanced risk calculation, fused into one weighted expression:
+        # reciprocal constants are precomputed and the clamps use
+        # conditional expressions instead of min()/max() builtin calls
+        employment_factor = 1.0 - employment_length * _INV_10  # More employment = better
+        if employment_factor < 0.0:
+            employment_factor = 0.0
+        dti_factor = dti_ratio * _INV_50  # DTI above 50% is high risk
+        if dti_factor > 1.0:
+            dti_factor = 1.0
+        accounts_factor = open_accounts * _INV_20  # Too many accounts = risk
+        if accounts_factor > 1.0:
+            accounts_factor = 1.0
+
         risk_score = (
-            loan_to_income * 0.25 +
-            fico_factor * 0.20 +
+            (loan_amount / annual_income) * 0.25 +
+            (850.0 - fico_score) * _INV_550 * 0.20 +  # Normalize FICO score (300-850)
             dti_factor * 0.20 +
-            interest_factor * 0.15 +
+            interest_rate * _INV_30 * 0.15 +  # Interest rate impact
             employment_factor * 0.10 +
             accounts_factor * 0.10
         )
-        
+
         # Normalize risk score between 0.1 and 0.9
-        risk_score = max(0.1, min(0.9, risk_score))
+        risk_score = 0.1 if risk_score < 0.1 else (0.9 if risk_score > 0.9 else risk_score)
         
         # Determine prediction (1 = default, 0 = no default)
         prediction = 1 if risk_score > 0.5 else 0
@@ -265,21 +836,51 @@ def predict_loan_default(input_data):
         else:
             risk_level = "Low"
             
-        print(f"🎯 Prediction result: {prediction}, Probability: {risk_score:.3f}, Risk: {risk_level}")
+        logger.debug("Prediction result: %s, probability: %.3f, risk: %s", prediction, risk_score, risk_level)
         
         return prediction, risk_score, risk_level
 
     except Exception as e:
-        print(f"❌ Prediction error: {e}")
+        logger.error("Prediction error: %s", e)
         # Return safe default values
         return 0, 0.3, "Low"
 
+# ================================
+# Static asset versioning
+# ================================
+# With a far-future max-age the browser never revalidates, so templates
+# append a version query derived from the file mtime (stat'd once per
+# worker, not per request) to bust the cache on deploys
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 31536000
+
+@lru_cache(maxsize=64)
+def _static_version(filename):
+    try:
+        return '?v=%d' % int(os.stat(os.path.join(app.static_folder, filename)).st_mtime)
+    except OSError:
+        return ''
+
+@app.template_global()
+def static_hashed(filename):
+    """url_for('static') with a cache-busting version query string."""
+    return url_for('static', filename=filename) + _static_version(filename)
+
+# With whitenoise installed, static requests are answered at the WSGI
+# layer - no Flask routing, view dispatch or request context per asset
+try:
+    from whitenoise import WhiteNoise
+    app.wsgi_app = WhiteNoise(app.wsgi_app, root=app.static_folder,
+                              prefix='static/', max_age=31536000)
+    print("✅ WhiteNoise serving static files")
+except ImportError:
+    print("⚠️ whitenoise not installed - Flask serves static files")
+
 # ================================
 # Routes
 # ================================
 @app.route('/')
 def home():
-    print("🏠 Home page accessed - User:", current_user.is_authenticated)
+    logger.debug("Home page accessed - authenticated: %s", current_user.is_authenticated)
     return render_template('index.html')
 
 @app.route('/login', methods=['GET', 'POST'])
@@ -287,7 +888,7 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('home'))
     
-    form = LoginForm()
+    form = get_forms().LoginForm()
     
     if form.validate_on_submit():
         username = form.username.data
@@ -297,12 +898,16 @@ def login():
         # Support both username and email login
         user = User.query_by_username_or_email(username)
         
-        if user and check_password_hash(user.password_hash, password):
+        if user and verify_password(user.password_hash, password):
+            maybe_upgrade_password_hash(user, password)
             login_user(user, remember=remember)
             flash('Welcome back, {}!'.format(user.username), 'success')
             next_page = request.args.get('next')
             return redirect(next_page) if next_page else redirect(url_for('home'))
         else:
+            if user is None:
+                # Equalize timing with the found-user branch
+                _verify_password_uncached(_dummy_password_hash(), password)
             flash('Invalid username/email or password', 'error')
     
     return render_template('login.html', form=form)
@@ -312,40 +917,53 @@ def register():
     if current_user.is_authenticated:
         return redirect(url_for('home'))
     
-    form = RegistrationForm()
+    form = get_forms().RegistrationForm()
     
     if form.validate_on_submit():
-        print("✅ Form validation successful")  # DEBUG
-        username = form.username.data
-        email = form.email.data
+        logger.debug("Registration form validated")
+        username = form.username.data.strip()
+        # Store emails lowercased so lookups stay exact-match (and indexed)
+        # instead of scanning for case variants, and duplicate registrations
+        # that differ only in case are rejected
+        email = form.email.data.strip().lower()
         password = form.password.data
         
-        # Check if username or email already exists
-        if User.query_by_username(username):
+        # Check username and email availability with a single query
+        conflicts = User.find_conflict(username, email)
+        if any(row.username.lower() == username.lower() for row in conflicts):
             flash('Username already exists', 'error')
-            print("❌ Username exists")  # DEBUG
-        elif User.query_by_email(email):
+            logger.debug("Username exists")
+        elif conflicts:
             flash('Email already exists', 'error')
-            print("❌ Email exists")  # DEBUG
+            logger.debug("Email exists")
         else:
             new_user = User(
                 username=username,
                 email=email,
-                password_hash=generate_password_hash(password)
+                password_hash=hash_password(password)
             )
             try:
                 db.session.add(new_user)
                 db.session.commit()
                 flash('Registration successful! Please login.', 'success')
-                print("✅ User created, redirecting to login")  # DEBUG
+                logger.debug("User created, redirecting to login")
                 return redirect(url_for('login'))
+            except IntegrityError:
+                # The unique constraints are the authoritative check: a
+                # concurrent registration can slip past find_conflict,
+                # but not past the database
+                db.session.rollback()
+                flash('Username or email already exists', 'error')
+                logger.warning("Registration conflict on insert")
             except Exception as e:
                 db.session.rollback()
                 flash('Error creating account. Please try again.', 'error')
-                print(f"❌ Registration error: {e}")
-    else:
-        print("❌ Form validation failed:", form.errors)  # DEBUG
-    
+                logger.error("Registration error: %s", e)
+    elif request.method == 'POST':
+        # Only a failed POST has validation errors worth reporting;
+        # plain GET page loads skip this branch entirely
+        logger.debug("Form validation failed: %s", form.errors)
+
     return render_template('register.html', form=form)
 
 @app.route('/logout')
@@ -360,13 +978,13 @@ def forgot_password():
     if current_user.is_authenticated:
         return redirect(url_for('home'))
     
-    form = ForgotPasswordForm()
+    form = get_forms().ForgotPasswordForm()
     
     if form.validate_on_submit():
         email = form.email.data
         user = User.query_by_email(email)  
         flash('If an account with that email exists, a password reset link has been sent.', 'info')
-        if user:
+        if user and not reset_email_recently_sent(user.email):
             send_password_reset_email(user)
     return render_template('forgot_password.html', form=form) 
 
@@ -381,14 +999,17 @@ def reset_password(token):
         return redirect(url_for('forgot_password'))
     
     user = User.query_by_email(email)
-    if not user:
+    # compare_digest keeps the email re-check constant-time: the token
+    # payload is attacker-supplied, so even this equality must not leak
+    # match length through timing
+    if not user or not hmac.compare_digest(user.email.lower().encode(), email.strip().lower().encode()):
         flash('Invalid reset link.', 'error')
         return redirect(url_for('forgot_password'))
     
-    form = ResetPasswordForm()
+    form = get_forms().ResetPasswordForm()
     
     if form.validate_on_submit():
-        new_password_hash = generate_password_hash(form.password.data)
+        new_password_hash = hash_password(form.password.data)
         
         try:
             user.update_password(new_password_hash)
@@ -396,7 +1017,7 @@ def reset_password(token):
             return redirect(url_for('login'))
         except Exception as e:
             flash('Error updating password. Please try again.', 'error')
-            print(f"Password reset error: {e}")
+            logger.error("Password reset error: %s", e)
     
     return render_template('reset_password.html', form=form)
 
@@ -404,13 +1025,17 @@ def reset_password(token):
 # PREDICTION ROUTES - FIXED
 # ================================
 @app.route('/predict', methods=['POST'])
+@csrf.exempt
 @login_required
 def predict():
     """Main prediction endpoint"""
     try:
-        data = request.get_json()
-        print("🎯 Prediction request received from user:", current_user.username)
-        print("📊 Prediction data:", data)
+        # Decode straight off the raw body without caching it on the
+        # request object - no second copy of the payload, and the JSON
+        # provider (orjson when installed) does the parse
+        data = app.json.loads(request.get_data(cache=False))
+        logger.debug("Prediction request from user: %s", current_user.username)
+        logger.debug("Prediction data: %s", data)
         
         # Validate required fields
         required_fields = ['LoanAmount', 'AnnualIncome', 'InterestRate', 'FicoScore']
@@ -432,22 +1057,71 @@ def predict():
             'message': f'Prediction completed: {risk_level} risk'
         }
         
-        print("✅ Prediction response:", response_data)
+        logger.debug("Prediction response: %s", response_data)
         return jsonify(response_data)
 
     except Exception as e:
-        print(f"❌ Prediction error: {e}")
+        logger.error("Prediction error: %s", e)
         return jsonify({
             'error': 'Prediction failed. Please check your input values.',
             'status': 'error'
         }), 500
 
 @app.route('/api/predict', methods=['POST'])
+@csrf.exempt
 @login_required
 def predict_api():
     """Alternative prediction endpoint for API consistency"""
     return predict()
 
+MAX_BATCH_SIZE = 10000
+
+@app.route('/api/predict/batch', methods=['POST'])
+@csrf.exempt
+@login_required
+def predict_batch_api():
+    """Score a JSON array of loans in one vectorized pass"""
+    try:
+        # Same uncached decode as the single predict path - batch bodies
+        # are the largest this app receives, so skip the extra copy
+        data = app.json.loads(request.get_data(cache=False))
+    except ValueError:
+        return jsonify({
+            'error': 'Request body must be valid JSON',
+            'status': 'error'
+        }), 400
+    if not isinstance(data, list) or not data:
+        return jsonify({
+            'error': 'Request body must be a non-empty JSON array',
+            'status': 'error'
+        }), 400
+    if len(data) > MAX_BATCH_SIZE:
+        return jsonify({
+            'error': f'Batch too large (max {MAX_BATCH_SIZE} rows)',
+            'status': 'error'
+        }), 400
+    if not all(isinstance(row, dict) for row in data):
+        return jsonify({
+            'error': 'Each batch item must be a JSON object',
+            'status': 'error'
+        }), 400
+
+    try:
+        predictions, risk_scores, risk_levels = predict_batch(data)
+    except (TypeError, ValueError) as e:
+        logger.debug("Batch prediction rejected: %s", e)
+        return jsonify({
+            'error': 'Batch prediction failed. Please check your input values.',
+            'status': 'error'
+        }), 400
+
+    results = [
+        {'prediction': int(p), 'probability': float(s), 'risk_level': str(l)}
+        for p, s, l in zip(predictions, risk_scores, risk_levels)
+    ]
+    logger.debug("Batch prediction completed for %d rows", len(results))
+    return jsonify({'results': results, 'count': len(results), 'status': 'success'})
+
 @app.route('/predict-page')
 @login_required
 def predict_page():
@@ -460,6 +1134,14 @@ def predict_page():
 @app.route('/api/auth-status')
 def auth_status():
     """Check if user is authenticated"""
+    # No session cookie and no remember-me cookie means no user to
+    # resolve: skip the cookie decode/HMAC verify and Flask-Login's
+    # user loader entirely
+    if (app.config.get('SESSION_COOKIE_NAME', 'session') not in request.cookies
+            and app.config.get('REMEMBER_COOKIE_NAME', 'remember_token') not in request.cookies):
+        response = Response(b'{"authenticated":false}', mimetype='application/json')
+        response.headers['Cache-Control'] = 'private, max-age=5'
+        return response
     if current_user.is_authenticated:
         return jsonify({
             'authenticated': True,
@@ -472,20 +1154,73 @@ def auth_status():
     else:
         return jsonify({'authenticated': False})
 
-@app.route('/static/<path:filename>')
-def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory(app.static_folder, filename)
+@lru_cache(maxsize=1)
+def _favicon_bytes():
+    with open(os.path.join(app.static_folder, 'favicon.ico'), 'rb') as f:
+        return f.read()
 
 @app.route('/favicon.ico')
 def favicon():
-    """Serve favicon"""
-    return send_from_directory(app.static_folder, 'favicon.ico')
+    """Serve favicon from memory - no per-request stat/open/read"""
+    response = Response(_favicon_bytes(), mimetype='image/vnd.microsoft.icon')
+    response.headers['Cache-Control'] = 'public, max-age=31536000'
+    return response
+
+# Cached database status for readiness reporting - refreshed at most
+# every few seconds by a background thread, so no caller ever waits on
+# (or floods) the database from the request path
+DB_STATUS_INTERVAL = 10
+_db_status = {'ok': True, 'checked_at': 0.0, 'refreshing': False}
+
+def _refresh_db_status():
+    try:
+        with app.app_context():
+            db.session.execute(text("SELECT 1"))
+        _db_status['ok'] = True
+    except Exception as e:
+        logger.warning("Background database check failed: %s", e)
+        _db_status['ok'] = False
+    finally:
+        _db_status['checked_at'] = time.time()
+        _db_status['refreshing'] = False
+
+def get_db_status():
+    """Return the cached database status, refreshing it in the background."""
+    if time.time() - _db_status['checked_at'] > DB_STATUS_INTERVAL and not _db_status['refreshing']:
+        _db_status['refreshing'] = True
+        threading.Thread(target=_refresh_db_status, daemon=True).start()
+    return _db_status['ok']
+
+@app.route('/ready')
+def readiness_check():
+    """Readiness endpoint with cached database status.
+
+    /health below is the cheap liveness probe answered at the WSGI
+    layer; this route reports whether the app can actually serve.
+    """
+    return jsonify({
+        'status': 'healthy',
+        'message': '✅ Server is running',
+        'database': 'ok' if get_db_status() else 'unavailable',
+    })
+
+# Load balancers hit /health every few seconds; answer those probes at
+# the WSGI layer so they skip Flask routing, session decoding, CORS and
+# Flask-Login entirely. Readiness detail lives on /ready above.
+_HEALTH_BODY = json.dumps({'status': 'healthy', 'message': '✅ Server is running'}).encode('utf-8')
+
+def _health_middleware(wsgi_app):
+    def middleware(environ, start_response):
+        if environ.get('PATH_INFO') == '/health':
+            start_response('200 OK', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(_HEALTH_BODY))),
+            ])
+            return [_HEALTH_BODY]
+        return wsgi_app(environ, start_response)
+    return middleware
 
-@app.route('/health')
-def health_check():
-    """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'message': '✅ Server is running'})
+app.wsgi_app = _health_middleware(app.wsgi_app)
 
 # ================================
 # Error Handlers - SIMPLIFIED
@@ -500,6 +1235,12 @@ def internal_error(error):
 
 @app.errorhandler(Exception)
 def handle_exception(error):
+    # Let 405/401/etc. keep their real status instead of becoming 500s
+    if isinstance(error, HTTPException):
+        return error
+    # logger.exception formats the traceback once, only when the record
+    # is actually emitted - no per-request formatting cost on success
+    app.logger.exception("Unhandled exception on %s %s", request.method, request.path)
     return "An error occurred", 500
 
 # ================================
@@ -5,4 +5,6 @@ python -c "from app import init_db; init_db()"
 
 # Start the Gunicorn server, binding to the port provided by Render
 # The format is app_file:flask_app_instance
-gunicorn --bind 0.0.0.0:$PORT app:app
\ No newline at end of file
+# gevent workers keep serving other requests while one waits on SMTP/DB
+export GEVENT_MONKEY_PATCH=true
+gunicorn --bind 0.0.0.0:$PORT --workers=4 --worker-class=gevent --worker-connections=1000 --timeout=120 --access-logfile=- wsgi:app
\ No newline at end of file
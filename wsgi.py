@@ -0,0 +1,12 @@
+"""WSGI entry point for production servers.
+
+Run with: gunicorn -w 4 -k gevent wsgi:app
+
+Importing through this module keeps the gunicorn command stable even if
+app.py is ever split up; the dev server stays behind app.py's
+__main__ block.
+"""
+from app import app
+
+if __name__ == "__main__":
+    app.run()